@@ -4,6 +4,13 @@ from .providers.http import (
 from .providers.async_http import (
     AsyncHTTPWithProxyProvider,
 )
+from .providers.async_multicall_http import (
+    AsyncMulticallHTTPWithProxyProvider,
+)
+from .providers.async_recording import (
+    AsyncRecordingProvider,
+    ResponseNotRecorded,
+)
 from .providers.websocket import (
     WebsocketWithProxyProvider,
 )
@@ -15,4 +22,11 @@ from .providers.async_websocket_subscription import (
     AsyncSubscriptionWebsocketProvider,
     AsyncSubscriptionWebsocketWithProxyProvider,
 )
-
+from .providers.sync_bridge import (
+    SyncBridgeProvider,
+)
+from .utils.resilience import (
+    AdaptiveTimeouts,
+    CircuitBreaker,
+    CircuitOpenError,
+)
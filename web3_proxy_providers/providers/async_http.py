@@ -6,6 +6,7 @@ from aiohttp_socks import (
 
 from typing import (
     Any,
+    AsyncIterator,
     Dict,
     Iterable,
     Optional,
@@ -37,6 +38,17 @@ from web3.providers.async_base import (
     AsyncJSONBaseProvider,
 )
 
+from web3_proxy_providers.utils.resilience import (
+    AdaptiveTimeouts,
+    CircuitBreaker,
+    RequestGuard,
+)
+from web3_proxy_providers.utils.streaming import (
+    iter_rpc_result,
+)
+
+STREAMING_CHUNK_SIZE = 64 * 1024
+
 
 class AsyncHTTPWithProxyProvider(AsyncJSONBaseProvider):
     logger = logging.getLogger("web3_proxy_providers.providers.AsyncHTTPWithProxyProvider")
@@ -49,7 +61,9 @@ class AsyncHTTPWithProxyProvider(AsyncJSONBaseProvider):
             proxy_host: Optional[str],
             proxy_port: Optional[int],
             endpoint_uri: Optional[Union[URI, str]] = None,
-            request_kwargs: Optional[Any] = None
+            request_kwargs: Optional[Any] = None,
+            timeouts: Optional[AdaptiveTimeouts] = None,
+            circuit_breaker: Optional[CircuitBreaker] = None
     ) -> None:
         if endpoint_uri is None:
             self.endpoint_uri = get_default_http_endpoint()
@@ -57,6 +71,8 @@ class AsyncHTTPWithProxyProvider(AsyncJSONBaseProvider):
             self.endpoint_uri = URI(endpoint_uri)
 
         self._request_kwargs = request_kwargs or {}
+        self.timeouts = timeouts
+        self.circuit_breaker = circuit_breaker
         if proxy_type is not None:
             connector = ProxyConnector(
                 proxy_type=proxy_type,
@@ -85,6 +101,11 @@ class AsyncHTTPWithProxyProvider(AsyncJSONBaseProvider):
             'User-Agent': construct_user_agent(str(type(self))),
         }
 
+    # noinspection PyMethodMayBeStatic
+    def get_timing_key(self, method: RPCEndpoint, params: Any) -> str:
+        # key under which the latency of the request is tracked by the adaptive timeouts
+        return method
+
     async def async_make_post_request(
             self, endpoint_uri: URI, data: bytes, **kwargs: Any
     ) -> bytes:
@@ -97,13 +118,36 @@ class AsyncHTTPWithProxyProvider(AsyncJSONBaseProvider):
         self.logger.debug("Making request HTTP. URI: %s, Method: %s",
                           self.endpoint_uri, method)
         request_data = self.encode_rpc_request(method, params)
-        raw_response = await self.async_make_post_request(
-            self.endpoint_uri,
-            request_data,
-            **self.get_request_kwargs()
-        )
-        response = self.decode_rpc_response(raw_response)
+        request_kwargs = self.get_request_kwargs()
+        with RequestGuard(self.get_timing_key(method, params), self.timeouts, self.circuit_breaker) as timeout:
+            if timeout is not None:
+                request_kwargs['timeout'] = aiohttp.ClientTimeout(timeout)
+            raw_response = await self.async_make_post_request(
+                self.endpoint_uri,
+                request_data,
+                **request_kwargs
+            )
+            response = self.decode_rpc_response(raw_response)
         self.logger.debug("Getting response HTTP. URI: %s, "
                           "Method: %s, Response: %s",
                           self.endpoint_uri, method, response)
         return response
+
+    async def make_streaming_request(self, method: RPCEndpoint, params: Any) -> AsyncIterator[Any]:
+        """
+        Sends the request and decodes the response body while it is downloaded, yielding the elements
+        of the ``result`` array (e.g. logs of ``eth_getLogs``) one by one, or the whole result if it is not an array.
+        Results are raw JSON values, web3 middlewares and result formatters are not applied.
+        The download has no overall deadline (it includes the time spent processing items),
+        it fails if no data is received for ``DEFAULT_TIMEOUT`` seconds. The circuit breaker applies
+        to streaming requests, adaptive timeouts do not.
+        """
+        self.logger.debug("Making streaming request HTTP. URI: %s, Method: %s",
+                          self.endpoint_uri, method)
+        request_data = self.encode_rpc_request(method, params)
+        kwargs = self.get_request_kwargs()
+        kwargs.setdefault("timeout", aiohttp.ClientTimeout(total=None, sock_read=DEFAULT_TIMEOUT))
+        with RequestGuard(method, None, self.circuit_breaker):
+            async with self.session.post(self.endpoint_uri, data=request_data, **kwargs) as response:
+                async for item in iter_rpc_result(response.content.iter_chunked(STREAMING_CHUNK_SIZE)):
+                    yield item
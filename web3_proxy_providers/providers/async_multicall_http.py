@@ -0,0 +1,294 @@
+import json
+import asyncio
+import logging
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from eth_abi import (
+    decode,
+    encode,
+)
+from eth_typing import (
+    URI,
+)
+from eth_utils import (
+    to_bytes,
+    to_hex,
+)
+from python_socks import ProxyType
+from web3.types import (
+    RPCEndpoint,
+    RPCResponse,
+)
+
+from web3_proxy_providers.providers.async_http import (
+    AsyncHTTPWithProxyProvider,
+)
+from web3_proxy_providers.utils.resilience import (
+    AdaptiveTimeouts,
+    CircuitBreaker,
+)
+
+# Multicall3 is deployed at the same address on most EVM chains
+# https://github.com/mds1/multicall
+DEFAULT_MULTICALL_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+DEFAULT_MULTICALL_WINDOW = 0.01
+DEFAULT_MULTICALL_MAX_CALLDATA_SIZE = 64 * 1024
+
+# aggregate calls are much heavier than single eth_calls, their latency is tracked separately
+MULTICALL_TIMING_KEY = 'eth_call:aggregate3'
+
+# keccak('aggregate3((address,bool,bytes)[])')[:4]
+AGGREGATE3_SELECTOR = bytes.fromhex('82ad56cb')
+
+# fields of an eth_call transaction which can be forwarded through Multicall3 without changing its meaning,
+# anything else (from, value, gas, ...) depends on the original caller and is sent as a separate request
+_AGGREGATABLE_CALL_KEYS = frozenset(('to', 'data', 'input'))
+
+# ABI head of a single (address,bool,bytes) tuple plus the bytes length word and array offset
+_CALL_ENCODING_OVERHEAD = 5 * 32
+
+
+def _is_multicall_failure(error: Any) -> bool:
+    # a revert of the aggregate call means there is no multicall contract at that block,
+    # running out of gas means the aggregate is too heavy for the node's eth_call gas cap
+    if not isinstance(error, dict):
+        return False
+    message = str(error.get('message', '')).lower()
+    return error.get('code') == 3 or 'revert' in message or 'out of gas' in message or 'exceeds allowance' in message
+
+
+class _PendingMulticall:
+    def __init__(self, block_identifier: Any) -> None:
+        self.block_identifier = block_identifier
+        self.calls: List[Tuple[bytes, bytes, 'asyncio.Future[RPCResponse]']] = []
+        self.calldata_size = len(AGGREGATE3_SELECTOR) + 2 * 32
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+
+
+class AsyncMulticallHTTPWithProxyProvider(AsyncHTTPWithProxyProvider):
+    """
+    Async HTTP provider which packs concurrent ``eth_call`` requests for the same block into
+    Multicall3 ``aggregate3`` calls.
+
+    Calls are collected for ``multicall_window`` seconds (or until the encoded calldata would exceed
+    ``multicall_max_calldata_size`` bytes) and sent as a single ``eth_call`` to ``multicall_address``.
+    Every caller receives its own JSON-RPC response, reverted calls are returned as an
+    ``execution reverted`` error carrying the revert data, like a node would for a plain ``eth_call``.
+    """
+    logger = logging.getLogger("web3_proxy_providers.providers.AsyncMulticallHTTPWithProxyProvider")
+
+    def __init__(
+            self,
+            proxy_type: Optional[ProxyType],
+            proxy_host: Optional[str],
+            proxy_port: Optional[int],
+            endpoint_uri: Optional[Union[URI, str]] = None,
+            request_kwargs: Optional[Any] = None,
+            multicall_address: str = DEFAULT_MULTICALL_ADDRESS,
+            multicall_window: float = DEFAULT_MULTICALL_WINDOW,
+            multicall_max_calldata_size: int = DEFAULT_MULTICALL_MAX_CALLDATA_SIZE,
+            timeouts: Optional[AdaptiveTimeouts] = None,
+            circuit_breaker: Optional[CircuitBreaker] = None
+    ) -> None:
+        self.multicall_address = multicall_address
+        self.multicall_window = multicall_window
+        self.multicall_max_calldata_size = multicall_max_calldata_size
+        self._pending_multicalls: Dict[str, _PendingMulticall] = {}
+        self._multicall_tasks: Set['asyncio.Task[None]'] = set()
+        super().__init__(
+            proxy_type, proxy_host, proxy_port, endpoint_uri, request_kwargs, timeouts, circuit_breaker
+        )
+
+    @staticmethod
+    def _get_aggregatable_call(params: Any) -> Optional[Tuple[bytes, bytes, Any]]:
+        if not params or len(params) > 2 or not isinstance(params[0], dict):
+            return None
+        transaction = params[0]
+        if not set(transaction.keys()).issubset(_AGGREGATABLE_CALL_KEYS) or transaction.get('to') is None:
+            return None
+        try:
+            target = to_bytes(hexstr=transaction['to'])
+            call_data = to_bytes(hexstr=transaction.get('data', transaction.get('input', '0x')))
+        except (TypeError, ValueError):
+            # let the node report malformed calls as it would for a plain request
+            return None
+        if len(target) != 20:
+            return None
+        block_identifier = params[1] if len(params) > 1 else 'latest'
+        return target, call_data, block_identifier
+
+    @staticmethod
+    def _get_block_key(block_identifier: Any) -> str:
+        if isinstance(block_identifier, int):
+            return hex(block_identifier)
+        if isinstance(block_identifier, str):
+            if block_identifier.startswith('0x') and len(block_identifier) < 66:
+                return hex(int(block_identifier, 16))
+            return block_identifier.lower()
+        return json.dumps(block_identifier, sort_keys=True)
+
+    def get_timing_key(self, method: RPCEndpoint, params: Any) -> str:
+        if (
+                method == 'eth_call' and params and isinstance(params[0], dict) and
+                str(params[0].get('to', '')).lower() == self.multicall_address.lower()
+        ):
+            return MULTICALL_TIMING_KEY
+        return super().get_timing_key(method, params)
+
+    def _make_response(self, result: Any = None, error: Optional[Dict[str, Any]] = None) -> RPCResponse:
+        response: Dict[str, Any] = {"jsonrpc": "2.0", "id": next(self.request_counter)}
+        if error is not None:
+            response['error'] = error
+        else:
+            response['result'] = result
+        return response
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        call = self._get_aggregatable_call(params) if method == 'eth_call' else None
+        if call is None:
+            return await super().make_request(method, params)
+
+        target, call_data, block_identifier = call
+        call_size = _CALL_ENCODING_OVERHEAD + (len(call_data) + 31) // 32 * 32
+        loop = asyncio.get_event_loop()
+        block_key = self._get_block_key(block_identifier)
+
+        pending = self._pending_multicalls.get(block_key)
+        if pending is not None and pending.calldata_size + call_size > self.multicall_max_calldata_size:
+            self._flush_multicall(block_key)
+            pending = None
+        if pending is None:
+            pending = _PendingMulticall(block_identifier)
+            pending.flush_handle = loop.call_later(self.multicall_window, self._flush_multicall, block_key)
+            self._pending_multicalls[block_key] = pending
+
+        future = loop.create_future()
+        pending.calls.append((target, call_data, future))
+        pending.calldata_size += call_size
+        return await future
+
+    def _flush_multicall(self, block_key: str) -> None:
+        pending = self._pending_multicalls.pop(block_key, None)
+        if pending is None:
+            return
+        pending.flush_handle.cancel()
+        task = asyncio.ensure_future(self._send_multicall(pending))
+        self._multicall_tasks.add(task)
+        task.add_done_callback(self._multicall_tasks.discard)
+
+    async def _send_multicall(self, pending: _PendingMulticall) -> None:
+        calls = pending.calls
+        try:
+            if len(calls) == 1:
+                target, call_data, future = calls[0]
+                await self._send_single_call(target, call_data, pending.block_identifier, future)
+            else:
+                await self._send_aggregate_call(pending)
+        except Exception as exc:
+            for _, _, future in calls:
+                if not future.done():
+                    future.set_exception(exc)
+        finally:
+            # never leave a caller waiting, e.g. when this task is cancelled
+            for _, _, future in calls:
+                if not future.done():
+                    future.cancel()
+
+    async def _send_aggregate_call(self, pending: _PendingMulticall) -> None:
+        calls = pending.calls
+        self.logger.debug("Aggregating %d eth_call requests for block %s via multicall %s",
+                          len(calls), pending.block_identifier, self.multicall_address)
+        try:
+            multicall_data = AGGREGATE3_SELECTOR + encode(
+                ['(address,bool,bytes)[]'],
+                [[(target, True, call_data) for target, call_data, _ in calls]]
+            )
+        except Exception as exc:
+            await self._send_calls_separately(calls, pending.block_identifier, exc)
+            return
+
+        # transport errors and timeouts are raised to every caller, sending the calls separately
+        # would only multiply the requests to an endpoint which is already failing
+        response = await super().make_request(
+            RPCEndpoint('eth_call'),
+            [{'to': self.multicall_address, 'data': to_hex(multicall_data)}, pending.block_identifier]
+        )
+        error = response.get('error')
+        if error is not None and not _is_multicall_failure(error):
+            # rate limits, node timeouts, ... apply to every call, re-sending them separately would make it worse
+            for _, _, future in calls:
+                if not future.done():
+                    future.set_result(self._make_response(error=error))
+            return
+        try:
+            if error is not None:
+                raise ValueError(error)
+            (results,) = decode(['(bool,bytes)[]'], to_bytes(hexstr=response['result']))
+            if len(results) != len(calls):
+                raise ValueError('Expected {0} multicall results, got {1}'.format(len(calls), len(results)))
+        except Exception as exc:
+            # the multicall itself failed (e.g. no multicall contract at that block or gas cap reached)
+            await self._send_calls_separately(calls, pending.block_identifier, exc)
+            return
+
+        unreliable_calls = []
+        for call, (success, return_data) in zip(calls, results):
+            future = call[2]
+            if future.done():
+                continue
+            if success:
+                future.set_result(self._make_response(result=to_hex(return_data)))
+            elif not return_data:
+                # sub-calls share the gas of the aggregate call, a failure without revert data is
+                # usually running out of it, which a plain eth_call would not do
+                unreliable_calls.append(call)
+            else:
+                future.set_result(self._make_response(error={
+                    'code': 3,
+                    'message': 'execution reverted',
+                    'data': to_hex(return_data),
+                }))
+        if unreliable_calls:
+            await self._send_calls_separately(
+                unreliable_calls, pending.block_identifier, 'calls failed without revert data'
+            )
+
+    async def _send_calls_separately(
+            self,
+            calls: List[Tuple[bytes, bytes, 'asyncio.Future[RPCResponse]']],
+            block_identifier: Any,
+            reason: Any
+    ) -> None:
+        self.logger.warning("Multicall for block %s failed, sending %d calls separately: %s",
+                            block_identifier, len(calls), reason)
+        await asyncio.gather(*(
+            self._send_single_call(target, call_data, block_identifier, future)
+            for target, call_data, future in calls
+        ))
+
+    async def _send_single_call(
+            self,
+            target: bytes,
+            call_data: bytes,
+            block_identifier: Any,
+            future: 'asyncio.Future[RPCResponse]'
+    ) -> None:
+        try:
+            response = await super().make_request(
+                RPCEndpoint('eth_call'),
+                [{'to': to_hex(target), 'data': to_hex(call_data)}, block_identifier]
+            )
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+        else:
+            if not future.done():
+                future.set_result(response)
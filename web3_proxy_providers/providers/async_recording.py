@@ -0,0 +1,228 @@
+import time
+import logging
+from typing import (
+    Any,
+    Dict,
+    Optional,
+)
+
+from web3.providers.async_base import (
+    AsyncBaseProvider,
+)
+from web3.types import (
+    RPCEndpoint,
+    RPCResponse,
+)
+
+from web3_proxy_providers.utils.response_store import (
+    ResponseNotRecorded,
+    ResponseStore,
+)
+
+DEFAULT_MIN_CONFIRMATIONS = 64
+DEFAULT_HEAD_REFRESH_INTERVAL = 12.0
+
+RECORD_MODE = 'record'
+REPLAY_MODE = 'replay'
+CACHE_MODE = 'cache'
+
+_BLOCK_TAGS = frozenset(('latest', 'earliest', 'pending', 'safe', 'finalized'))
+
+# position of the block identifier in params of methods whose response never changes for a fixed block
+_BLOCK_PARAM_INDEX = {
+    'eth_getBlockByNumber': 0,
+    'eth_getBlockReceipts': 0,
+    'eth_getBlockTransactionCountByNumber': 0,
+    'eth_getTransactionByBlockNumberAndIndex': 0,
+    'eth_getUncleByBlockNumberAndIndex': 0,
+    'eth_getUncleCountByBlockNumber': 0,
+    'debug_traceBlockByNumber': 0,
+    'trace_block': 0,
+    'eth_call': 1,
+    'eth_getBalance': 1,
+    'eth_getCode': 1,
+    'eth_getTransactionCount': 1,
+    'eth_getStorageAt': 2,
+    'eth_getProof': 2,
+}
+
+# methods keyed by a hash (or constant for the chain), immutable once they return a non-null result
+_HASH_METHODS = frozenset((
+    'eth_chainId',
+    'net_version',
+    'eth_getBlockByHash',
+    'eth_getBlockTransactionCountByHash',
+    'eth_getTransactionByBlockHashAndIndex',
+    'eth_getUncleByBlockHashAndIndex',
+    'eth_getUncleCountByBlockHash',
+    'eth_getTransactionReceipt',
+    'debug_traceBlockByHash',
+    'debug_traceTransaction',
+    'trace_transaction',
+))
+
+
+def _is_fixed_block(block_identifier: Any) -> bool:
+    if isinstance(block_identifier, int):
+        return True
+    if isinstance(block_identifier, str):
+        return block_identifier not in _BLOCK_TAGS
+    if isinstance(block_identifier, dict):
+        return 'blockHash' in block_identifier or _is_fixed_block(block_identifier.get('blockNumber'))
+    return False
+
+
+def _to_block_number(block_identifier: Any) -> Optional[int]:
+    if isinstance(block_identifier, dict):
+        block_identifier = block_identifier.get('blockNumber')
+    if isinstance(block_identifier, int):
+        return block_identifier
+    # 32 byte hex strings are block hashes
+    if isinstance(block_identifier, str) and block_identifier not in _BLOCK_TAGS and len(block_identifier) < 66:
+        return int(block_identifier, 16)
+    return None
+
+
+def get_block_number(method: str, params: Any, response: Optional[Dict[str, Any]] = None) -> Optional[int]:
+    """
+    Returns the number of the block an immutable request depends on if it can be changed by a reorg,
+    i.e. if the request refers to a block number or the response places a transaction in a block
+    """
+    params = params or []
+    if method in ('eth_getTransactionReceipt', 'eth_getTransactionByHash'):
+        if response is None or not isinstance(response.get('result'), dict):
+            return None
+        return _to_block_number(response['result'].get('blockNumber'))
+    if method == 'eth_getLogs':
+        if not params or not isinstance(params[0], dict) or 'blockHash' in params[0]:
+            return None
+        return _to_block_number(params[0].get('toBlock'))
+    block_param_index = _BLOCK_PARAM_INDEX.get(method)
+    if block_param_index is None or len(params) <= block_param_index:
+        return None
+    return _to_block_number(params[block_param_index])
+
+
+def is_immutable_request(method: str, params: Any, response: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Returns True if the request refers to a fixed block or hash, so its (successful) response can be cached forever
+    once the block returned by ``get_block_number`` (if any) is deep enough to not be reorged.
+    """
+    if response is not None and (response.get('error') is not None or response.get('result') is None):
+        return False
+    params = params or []
+    if method in _HASH_METHODS:
+        return True
+    if method == 'eth_getTransactionByHash':
+        # pending transactions are returned without a block hash
+        return response is None or response['result'].get('blockHash') is not None
+    if method == 'eth_getLogs':
+        if not params or not isinstance(params[0], dict):
+            return False
+        log_filter = params[0]
+        if 'blockHash' in log_filter:
+            return True
+        return (
+            _is_fixed_block(log_filter.get('fromBlock', 'latest')) and
+            _is_fixed_block(log_filter.get('toBlock', 'latest'))
+        )
+    block_param_index = _BLOCK_PARAM_INDEX.get(method)
+    if block_param_index is None or len(params) <= block_param_index:
+        return False
+    return _is_fixed_block(params[block_param_index])
+
+
+class AsyncRecordingProvider(AsyncBaseProvider):
+    """
+    Wraps an async provider and records its traffic to a ``ResponseStore``
+
+    Modes:
+        * ``record``: every request is sent to the wrapped provider and its response is appended to the store
+        * ``replay``: requests are only served from the store, in the order they were recorded;
+          once the recorded responses of a request are used up, the last one is repeated.
+          Raises ``ResponseNotRecorded`` for requests missing from the store.
+        * ``cache``: immutable requests (fixed block number, block/transaction hash) are served from the store
+          and recorded on a miss, everything else is sent to the wrapped provider. Responses depending on a block
+          number are only recorded once the block has ``min_confirmations`` confirmations, the chain head is
+          fetched with ``eth_blockNumber`` at most every ``head_refresh_interval`` seconds to check it.
+    """
+    logger = logging.getLogger("web3_proxy_providers.providers.AsyncRecordingProvider")
+
+    def __init__(
+            self,
+            provider: Optional[AsyncBaseProvider],
+            store_path: str,
+            mode: str = RECORD_MODE,
+            min_confirmations: int = DEFAULT_MIN_CONFIRMATIONS,
+            head_refresh_interval: float = DEFAULT_HEAD_REFRESH_INTERVAL
+    ) -> None:
+        if mode not in (RECORD_MODE, REPLAY_MODE, CACHE_MODE):
+            raise ValueError('Unknown recording mode {0}'.format(mode))
+        if provider is None and mode != REPLAY_MODE:
+            raise ValueError('A provider is required in {0} mode'.format(mode))
+        self.provider = provider
+        self.mode = mode
+        self.store = ResponseStore(store_path)
+        self.min_confirmations = min_confirmations
+        self.head_refresh_interval = head_refresh_interval
+        self._replay_positions: Dict[bytes, int] = {}
+        self._head_block_number = -1
+        self._head_refreshed_at: Optional[float] = None
+        super().__init__()
+
+    def __str__(self) -> str:
+        return "Recording ({0}) {1}".format(self.mode, self.provider)
+
+    def _replay(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        key = self.store.make_key(method, params)
+        count = self.store.count(key)
+        if count == 0:
+            raise ResponseNotRecorded('No recorded response for {0} with params {1}'.format(method, params))
+        position = self._replay_positions.get(key, 0)
+        if position + 1 < count:
+            self._replay_positions[key] = position + 1
+        return self.store.get(key, position)
+
+    async def _is_confirmed(self, method: RPCEndpoint, params: Any, response: RPCResponse) -> bool:
+        block_number = get_block_number(method, params, response)
+        if block_number is None:
+            return True
+        if self._head_block_number - block_number < self.min_confirmations and (
+                self._head_refreshed_at is None or
+                time.monotonic() - self._head_refreshed_at >= self.head_refresh_interval
+        ):
+            self._head_refreshed_at = time.monotonic()
+            head_response = await self.provider.make_request(RPCEndpoint('eth_blockNumber'), [])
+            head_block_number = _to_block_number(head_response.get('result'))
+            if head_block_number is not None:
+                self._head_block_number = max(self._head_block_number, head_block_number)
+        return self._head_block_number - block_number >= self.min_confirmations
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        if self.mode == REPLAY_MODE:
+            self.logger.debug("Replaying request. Method: %s", method)
+            return self._replay(method, params)
+
+        if self.mode == CACHE_MODE and is_immutable_request(method, params):
+            key = self.store.make_key(method, params)
+            if key in self.store:
+                self.logger.debug("Serving request from store. Method: %s", method)
+                return self.store.get(key)
+            response = await self.provider.make_request(method, params)
+            if is_immutable_request(method, params, response) and await self._is_confirmed(method, params, response):
+                self.store.append(method, params, response)
+            return response
+
+        response = await self.provider.make_request(method, params)
+        if self.mode == RECORD_MODE:
+            self.store.append(method, params, response)
+        return response
+
+    async def is_connected(self) -> bool:
+        if self.mode == REPLAY_MODE:
+            return True
+        return await self.provider.is_connected()
+
+    def close(self) -> None:
+        self.store.close()
+
@@ -1,7 +1,6 @@
 import json
 from types import TracebackType
 
-import socks
 import logging
 import asyncio
 from eth_typing import URI
@@ -25,17 +24,11 @@ from websockets.legacy.client import (
     WebSocketClientProtocol,
 )
 import websockets
-from urllib.parse import urlparse
 from web3.types import RPCEndpoint, RPCResponse
 from web3.providers.async_base import AsyncJSONBaseProvider
 
-from web3_proxy_providers.utils.proxy import PROXY_TYPE_TO_INT_MAP
-
-
-def _start_event_loop(loop: asyncio.AbstractEventLoop) -> None:
-    asyncio.set_event_loop(loop)
-    loop.run_forever()
-    loop.close()
+from web3_proxy_providers.utils.proxy import connect_through_proxy, get_endpoint_address
+from web3_proxy_providers.utils.resilience import AdaptiveTimeouts, CircuitBreaker, RequestGuard
 
 
 class _ProxySupportingPersistentWebSocket:
@@ -43,22 +36,23 @@ class _ProxySupportingPersistentWebSocket:
             self,
             endpoint_uri: URI,
             websocket_kwargs: Any,
-            proxy: Optional[Tuple[ProxyType, str, int]] = None
+            proxy: Optional[Tuple[ProxyType, str, int]] = None,
+            proxy_timeout: Optional[float] = None
     ) -> None:
         self.ws: WebSocketClientProtocol = None
         self.endpoint_uri = endpoint_uri
         self.websocket_kwargs = websocket_kwargs
         self.proxy = proxy
+        self.proxy_timeout = proxy_timeout
 
     async def __aenter__(self) -> WebSocketClientProtocol:
         if self.ws is None:
             if self.proxy:
-                netloc = urlparse(self.endpoint_uri).netloc
-                proxy = socks.socksocket()
-                proxy.set_proxy(PROXY_TYPE_TO_INT_MAP[self.proxy[0]], self.proxy[1], self.proxy[2])
-                proxy.connect((netloc, 443))
-                self.websocket_kwargs['sock'] = proxy
-                self.websocket_kwargs['server_hostname'] = netloc
+                self.websocket_kwargs['sock'] = await connect_through_proxy(
+                    self.proxy, self.endpoint_uri, self.proxy_timeout
+                )
+                if self.endpoint_uri.startswith('wss'):
+                    self.websocket_kwargs['server_hostname'] = get_endpoint_address(self.endpoint_uri)[0]
             self.ws = await websockets.connect(uri=self.endpoint_uri, **self.websocket_kwargs)
         return self.ws
 
@@ -85,10 +79,14 @@ class AsyncWebsocketProvider(AsyncJSONBaseProvider):
             endpoint_uri: Optional[Union[URI, str]] = None,
             websocket_kwargs: Optional[Any] = None,
             websocket_timeout: int = DEFAULT_WEBSOCKET_TIMEOUT,
-            proxy: Optional[Tuple[ProxyType, str, int]] = None
+            proxy: Optional[Tuple[ProxyType, str, int]] = None,
+            timeouts: Optional[AdaptiveTimeouts] = None,
+            circuit_breaker: Optional[CircuitBreaker] = None
     ) -> None:
         self.endpoint_uri = URI(endpoint_uri)
         self.websocket_timeout = websocket_timeout
+        self.timeouts = timeouts
+        self.circuit_breaker = circuit_breaker
         if self.endpoint_uri is None:
             self.endpoint_uri = get_default_endpoint()
         self.loop = loop
@@ -107,23 +105,27 @@ class AsyncWebsocketProvider(AsyncJSONBaseProvider):
                     'found: {1}'.format(RESTRICTED_WEBSOCKET_KWARGS, found_restricted_keys)
                 )
         self.conn = _ProxySupportingPersistentWebSocket(
-            self.endpoint_uri, proxy, websocket_kwargs
+            self.endpoint_uri,
+            websocket_kwargs=websocket_kwargs,
+            proxy=proxy,
+            proxy_timeout=websocket_timeout
         )
         super().__init__()
 
     def __str__(self) -> str:
         return "WS connection {0}".format(self.endpoint_uri)
 
-    async def coro_make_request(self, request_data: bytes) -> RPCResponse:
+    async def coro_make_request(self, request_data: bytes, timeout: Optional[float] = None) -> RPCResponse:
+        timeout = timeout or self.websocket_timeout
         async with self.conn as conn:
             await asyncio.wait_for(
                 conn.send(request_data),
-                timeout=self.websocket_timeout
+                timeout=timeout
             )
             return json.loads(
                 await asyncio.wait_for(
                     conn.recv(),
-                    timeout=self.websocket_timeout
+                    timeout=timeout
                 )
             )
 
@@ -131,7 +133,8 @@ class AsyncWebsocketProvider(AsyncJSONBaseProvider):
         self.logger.debug("Making request WebSocket. URI: %s, "
                           "Method: %s", self.endpoint_uri, method)
         request_data = self.encode_rpc_request(method, params)
-        result = await self.coro_make_request(request_data)
+        with RequestGuard(method, self.timeouts, self.circuit_breaker) as timeout:
+            result = await self.coro_make_request(request_data, timeout)
         self.logger.debug("Result for URI: %s, "
                           "Method: %s is %s", self.endpoint_uri, method, result)
         return result
@@ -148,7 +151,17 @@ class AsyncWebsocketWithProxyProvider(AsyncWebsocketProvider):
             proxy_host: str,
             proxy_port: int,
             websocket_kwargs: Optional[Any] = None,
-            websocket_timeout: int = DEFAULT_WEBSOCKET_TIMEOUT
+            websocket_timeout: int = DEFAULT_WEBSOCKET_TIMEOUT,
+            timeouts: Optional[AdaptiveTimeouts] = None,
+            circuit_breaker: Optional[CircuitBreaker] = None
     ):
         websocket_kwargs = websocket_kwargs or {}
-        super().__init__(loop, endpoint_uri, websocket_kwargs, websocket_timeout, (proxy_type, proxy_host, proxy_port))
+        super().__init__(
+            loop,
+            endpoint_uri,
+            websocket_kwargs,
+            websocket_timeout,
+            (proxy_type, proxy_host, proxy_port),
+            timeouts,
+            circuit_breaker
+        )
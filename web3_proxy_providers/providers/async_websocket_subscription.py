@@ -1,5 +1,4 @@
 import json
-import socks
 import asyncio
 import logging
 import inspect
@@ -22,7 +21,6 @@ from eth_typing import (
 from eth_utils import (
     to_bytes, to_text,
 )
-from urllib.parse import urlparse
 
 from python_socks import ProxyType
 from web3.providers import AsyncBaseProvider
@@ -44,7 +42,8 @@ from web3.exceptions import (
     ValidationError
 )
 
-from web3_proxy_providers.utils.proxy import PROXY_TYPE_TO_INT_MAP
+from web3_proxy_providers.utils.proxy import connect_through_proxy, get_endpoint_address
+from web3_proxy_providers.utils.resilience import AdaptiveTimeouts, CircuitBreaker, RequestGuard
 
 
 # def construct_user_agent(class_name: str) -> str:
@@ -165,9 +164,13 @@ class AsyncSubscriptionWebsocketProvider(AsyncSubscriptionJSONBaseProvider):
             websocket_kwargs: Optional[Any] = None,
             websocket_timeout: int = DEFAULT_WEBSOCKET_TIMEOUT,
             proxy: Optional[Tuple[ProxyType, str, int]] = None,
+            timeouts: Optional[AdaptiveTimeouts] = None,
+            circuit_breaker: Optional[CircuitBreaker] = None,
     ) -> None:
         self.endpoint_uri = URI(endpoint_uri)
         self.websocket_timeout = websocket_timeout
+        self.timeouts = timeouts
+        self.circuit_breaker = circuit_breaker
         if self.endpoint_uri is None:
             self.endpoint_uri = get_default_endpoint()
         self.loop = loop
@@ -190,6 +193,8 @@ class AsyncSubscriptionWebsocketProvider(AsyncSubscriptionJSONBaseProvider):
         self._pending_subscription_callbacks: Dict[str, Callable[[str, Any], Any]] = {}
         self._pending_futures: Dict[int, Any] = {}
         self._initialized = False
+        self._initialize_task: Optional[asyncio.Task] = None
+        self._reader_task: Optional[asyncio.Task] = None
         super().__init__()
 
     def __str__(self) -> str:
@@ -199,53 +204,85 @@ class AsyncSubscriptionWebsocketProvider(AsyncSubscriptionJSONBaseProvider):
         self.logger.debug("Initializing")
 
         if self.proxy:
-            netloc = urlparse(self.endpoint_uri).netloc
-            proxy = socks.socksocket()
-            proxy.set_proxy(PROXY_TYPE_TO_INT_MAP[self.proxy[0]], self.proxy[1], self.proxy[2])
-            proxy.connect((netloc, 443))
-            self._websocket_kwargs['sock'] = proxy
-            self._websocket_kwargs['server_hostname'] = netloc
+            self._websocket_kwargs['sock'] = await connect_through_proxy(
+                self.proxy, self.endpoint_uri, self.websocket_timeout
+            )
+            if self.endpoint_uri.startswith('wss'):
+                self._websocket_kwargs['server_hostname'] = get_endpoint_address(self.endpoint_uri)[0]
 
         self.ws = await websockets.connect(
             uri=self.endpoint_uri, loop=self.loop, **self._websocket_kwargs
         )
-        self.loop.create_task(self._read_websocket_messages())
+        self._reader_task = self.loop.create_task(self._read_websocket_messages(self.ws))
         self._initialized = True
 
-    async def _read_websocket_messages(self):
-        async for message in self.ws:
-            self.logger.debug(f"New ws message {message}")
-            message_json = json.loads(message)
-            message_json_id = message_json.get('id')
-            eth_method = message_json.get('method')
-            if message_json_id is not None:
-                # pending_result = self._pending_results.get(message_json_id)
-                pending_future = self._pending_futures.get(message_json_id)
-                if pending_future is not None:
-                    if message_json.get('error') is not None:
-                        self.logger.error(message_json['error'])
-                        pending_future.set_result(None)
-                    else:
-                        message_result = message_json.get('result')
-                        if message_result is None:
-                            raise Exception(f'No result in response to subscription on request id {message_json_id}: '
-                                            f'{message}')
-
-                        pending_future.set_result(message_json)
-                else:
-                    self.logger.warning(f'Cannot find method callback for response {message}')
-            elif eth_method == 'eth_subscription':
-                subscription = message_json['params']['subscription']
-                subscription_callback = self._pending_subscription_callbacks.get(subscription)
-                if subscription_callback is not None:
-                    if inspect.iscoroutinefunction(subscription_callback):
-                        await subscription_callback(subscription, message_json['params']['result'])
-                    else:
-                        subscription_callback(subscription, message_json['params']['result'])
+    async def _ensure_initialized(self):
+        # concurrent first requests share a single connection attempt
+        if self._initialize_task is None:
+            self._initialize_task = self.loop.create_task(self.initialize())
+        initialize_task = self._initialize_task
+        try:
+            await asyncio.shield(initialize_task)
+        except Exception:
+            if self._initialize_task is initialize_task and initialize_task.done():
+                self._initialize_task = None
+            raise
+
+    async def _read_websocket_messages(self, ws: WebSocketClientProtocol):
+        close_exception: Exception = ConnectionError(f'Websocket connection to {self.endpoint_uri} closed')
+        try:
+            async for message in ws:
+                try:
+                    await self._handle_websocket_message(message)
+                except Exception:
+                    # a bad message or callback must not stop the responses of other requests
+                    self.logger.exception(f'Cannot handle ws message {message}')
+        except Exception as exc:
+            close_exception = exc
+        finally:
+            if self.ws is ws:
+                self._on_connection_closed(close_exception)
+
+    def _on_connection_closed(self, close_exception: Exception):
+        self.logger.warning(f"Websocket connection to {self.endpoint_uri} closed: {close_exception!r}")
+        # the next request opens a new connection
+        self._initialized = False
+        self._initialize_task = None
+        pending_futures = self._pending_futures
+        self._pending_futures = {}
+        for pending_future in pending_futures.values():
+            if not pending_future.done():
+                pending_future.set_exception(close_exception)
+        if self._pending_subscription_callbacks:
+            self.logger.warning(f"Subscriptions {list(self._pending_subscription_callbacks)} "
+                                f"were lost with the connection")
+            self._pending_subscription_callbacks = {}
+
+    async def _handle_websocket_message(self, message: Union[str, bytes]):
+        self.logger.debug(f"New ws message {message}")
+        message_json = json.loads(message)
+        message_json_id = message_json.get('id')
+        eth_method = message_json.get('method')
+        if message_json_id is not None:
+            pending_future = self._pending_futures.get(message_json_id)
+            # the request may have timed out or been cancelled before its response arrived
+            if pending_future is not None and not pending_future.done():
+                # results (including null) and errors are returned as they are, web3 handles them
+                pending_future.set_result(message_json)
+            elif pending_future is None:
+                self.logger.warning(f'Cannot find method callback for response {message}')
+        elif eth_method == 'eth_subscription':
+            subscription = message_json['params']['subscription']
+            subscription_callback = self._pending_subscription_callbacks.get(subscription)
+            if subscription_callback is not None:
+                if inspect.iscoroutinefunction(subscription_callback):
+                    await subscription_callback(subscription, message_json['params']['result'])
                 else:
-                    self.logger.warning(f'Cannot find subscription callback for {subscription}')
+                    subscription_callback(subscription, message_json['params']['result'])
             else:
-                self.logger.error(f'Unknown message {message}')
+                self.logger.warning(f'Cannot find subscription callback for {subscription}')
+        else:
+            self.logger.error(f'Unknown message {message}')
 
     # noinspection PyMethodMayBeStatic
     def decode_rpc_response(self, raw_response: bytes) -> RPCResponse:
@@ -254,23 +291,28 @@ class AsyncSubscriptionWebsocketProvider(AsyncSubscriptionJSONBaseProvider):
 
     async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
         if self._initialized is False:
-            await self.initialize()
+            await self._ensure_initialized()
         request_id, request_data = self.encode_rpc_request(method, params)
         self.logger.debug("Making request WebSocket. URI: %s, "
                           "Method: %s, request Id: %s", self.endpoint_uri, method, request_id)
 
         future = self.loop.create_future()
         self._pending_futures[request_id] = future
-        await asyncio.wait_for(
-            self.ws.send(request_data),
-            timeout=self.websocket_timeout
-        )
-        result = await future
+        try:
+            with RequestGuard(method, self.timeouts, self.circuit_breaker) as timeout:
+                await asyncio.wait_for(
+                    self.ws.send(request_data),
+                    timeout=timeout or self.websocket_timeout
+                )
+                # without adaptive timeouts the response is awaited indefinitely
+                result = await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            self._pending_futures.pop(request_id, None)
         return result
 
     async def subscribe(self, params: Any, callback: Callable[[str, Any], Any]) -> str:
         if self._initialized is False:
-            await self.initialize()
+            await self._ensure_initialized()
         result = await self.make_request(method=RPCEndpoint("eth_subscribe"), params=params)
         subscription_id = result['result']
         self._pending_subscription_callbacks[subscription_id] = callback
@@ -279,7 +321,7 @@ class AsyncSubscriptionWebsocketProvider(AsyncSubscriptionJSONBaseProvider):
 
     async def unsubscribe(self, subscription_id: str) -> bool:
         if self._initialized is False:
-            await self.initialize()
+            await self._ensure_initialized()
         # noinspection PyTypeChecker
         result = await self.make_request(method="eth_unsubscribe", params=[subscription_id])
         result_success = result['result']
@@ -299,7 +341,9 @@ class AsyncSubscriptionWebsocketWithProxyProvider(AsyncSubscriptionWebsocketProv
             proxy_host: str,
             proxy_port: int,
             websocket_kwargs: Optional[Any] = None,
-            websocket_timeout: int = DEFAULT_WEBSOCKET_TIMEOUT
+            websocket_timeout: int = DEFAULT_WEBSOCKET_TIMEOUT,
+            timeouts: Optional[AdaptiveTimeouts] = None,
+            circuit_breaker: Optional[CircuitBreaker] = None
     ):
         websocket_kwargs = websocket_kwargs or {}
         super().__init__(
@@ -307,5 +351,7 @@ class AsyncSubscriptionWebsocketWithProxyProvider(AsyncSubscriptionWebsocketProv
             endpoint_uri,
             websocket_kwargs,
             websocket_timeout,
-            (proxy_type, proxy_host, proxy_port)
+            (proxy_type, proxy_host, proxy_port),
+            timeouts,
+            circuit_breaker
         )
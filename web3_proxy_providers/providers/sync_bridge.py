@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import concurrent.futures
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Optional,
+    TypeVar,
+)
+
+from web3.providers.async_base import (
+    AsyncBaseProvider,
+)
+from web3.providers.base import (
+    BaseProvider,
+)
+from web3.providers.websocket import (
+    DEFAULT_WEBSOCKET_TIMEOUT,
+)
+from web3.types import (
+    RPCEndpoint,
+    RPCResponse,
+)
+
+from web3_proxy_providers.utils.loop import (
+    get_shared_event_loop,
+)
+
+TResult = TypeVar('TResult')
+
+
+class SyncBridgeProvider(BaseProvider):
+    """
+    Sync provider which forwards requests to an async provider running on a shared background event loop
+
+    ``async_provider_factory`` is called on that loop with the loop as argument, so connections and
+    sessions of the async provider are bound to it. Requests from any number of threads are pipelined on
+    the async provider, use a multiplexed one (``AsyncSubscriptionWebsocketWithProxyProvider``
+    or ``AsyncHTTPWithProxyProvider``) to share a single connection between threads.
+    """
+    logger = logging.getLogger("web3_proxy_providers.providers.SyncBridgeProvider")
+
+    def __init__(
+            self,
+            async_provider_factory: Callable[[asyncio.AbstractEventLoop], AsyncBaseProvider],
+            loop: Optional[asyncio.AbstractEventLoop] = None,
+            request_timeout: Optional[float] = DEFAULT_WEBSOCKET_TIMEOUT
+    ) -> None:
+        self.loop = loop or get_shared_event_loop()
+        self.request_timeout = request_timeout
+        self.async_provider = self._run(self._create_async_provider(async_provider_factory))
+        super().__init__()
+
+    def __str__(self) -> str:
+        return "Sync bridge to {0}".format(self.async_provider)
+
+    async def _create_async_provider(
+            self,
+            async_provider_factory: Callable[[asyncio.AbstractEventLoop], AsyncBaseProvider]
+    ) -> AsyncBaseProvider:
+        return async_provider_factory(self.loop)
+
+    def _run(self, coroutine: Coroutine[Any, Any, TResult]) -> TResult:
+        if self._in_loop_thread():
+            coroutine.close()
+            raise RuntimeError('SyncBridgeProvider cannot be used from its own event loop thread')
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        try:
+            return future.result(self.request_timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def _in_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        self.logger.debug("Forwarding request to %s. Method: %s", self.async_provider, method)
+        return self._run(self.async_provider.make_request(method, params))
+
+    def is_connected(self) -> bool:
+        return self._run(self.async_provider.is_connected())
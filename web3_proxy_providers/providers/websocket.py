@@ -1,12 +1,11 @@
 import socks
 import logging
 from typing import Optional, Any
-from urllib.parse import urlparse
 
 from python_socks import ProxyType
 from web3.providers.websocket import WebsocketProvider, DEFAULT_WEBSOCKET_TIMEOUT
 
-from web3_proxy_providers.utils.proxy import PROXY_TYPE_TO_INT_MAP
+from web3_proxy_providers.utils.proxy import PROXY_TYPE_TO_INT_MAP, get_endpoint_address
 
 
 class WebsocketWithProxyProvider(WebsocketProvider):
@@ -22,10 +21,10 @@ class WebsocketWithProxyProvider(WebsocketProvider):
             websocket_timeout: int = DEFAULT_WEBSOCKET_TIMEOUT
     ):
         websocket_kwargs = websocket_kwargs or {}
-        netloc = urlparse(endpoint_uri).netloc
+        host, port = get_endpoint_address(endpoint_uri)
         proxy = socks.socksocket()
         proxy.set_proxy(PROXY_TYPE_TO_INT_MAP[proxy_type], proxy_host, proxy_port)
-        proxy.connect((netloc, 443))
+        proxy.connect((host, port))
         websocket_kwargs['sock'] = proxy
-        websocket_kwargs['server_hostname'] = netloc
+        websocket_kwargs['server_hostname'] = host
         super().__init__(endpoint_uri, websocket_kwargs, websocket_timeout)
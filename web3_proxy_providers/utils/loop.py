@@ -0,0 +1,38 @@
+import asyncio
+import threading
+from typing import (
+    Optional,
+)
+
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+_shared_loop_lock = threading.Lock()
+
+
+def _start_event_loop(loop: asyncio.AbstractEventLoop) -> None:
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+    loop.close()
+
+
+def _get_threaded_loop() -> asyncio.AbstractEventLoop:
+    new_loop = asyncio.new_event_loop()
+    thread_loop = threading.Thread(
+        target=_start_event_loop,
+        args=(new_loop,),
+        name='web3-proxy-providers-loop',
+        daemon=True
+    )
+    thread_loop.start()
+    return new_loop
+
+
+def get_shared_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the event loop shared by sync providers, running forever in a daemon thread
+    which is started on first use
+    """
+    global _shared_loop
+    with _shared_loop_lock:
+        if _shared_loop is None or _shared_loop.is_closed():
+            _shared_loop = _get_threaded_loop()
+        return _shared_loop
@@ -1,6 +1,10 @@
 # noinspection PyPackageRequirements
 import socks
+import socket
+from typing import Optional, Tuple
+from urllib.parse import urlparse
 from python_socks import ProxyType
+from python_socks.async_.asyncio import Proxy
 
 PROXY_TYPE_TO_INT_MAP = {
     ProxyType.SOCKS5: socks.SOCKS5,
@@ -13,3 +17,32 @@ INT_TO_PROXY_TYPE_MAP = {
     socks.SOCKS4: ProxyType.SOCKS4,
     socks.HTTP: ProxyType.HTTP
 }
+
+DEFAULT_PORTS = {
+    'ws': 80,
+    'http': 80,
+    'wss': 443,
+    'https': 443,
+}
+
+
+def get_endpoint_address(endpoint_uri: str) -> Tuple[str, int]:
+    """
+    Returns the host and port to connect to through the proxy, using the default port of the scheme
+    if the endpoint does not specify one
+    """
+    parsed_uri = urlparse(endpoint_uri)
+    return parsed_uri.hostname, parsed_uri.port or DEFAULT_PORTS.get(parsed_uri.scheme, 443)
+
+
+async def connect_through_proxy(
+        proxy: Tuple[ProxyType, str, int],
+        endpoint_uri: str,
+        timeout: Optional[float] = None
+) -> socket.socket:
+    """
+    Opens a connection to the endpoint through the proxy without blocking the event loop
+    """
+    host, port = get_endpoint_address(endpoint_uri)
+    async_proxy = Proxy.create(proxy_type=proxy[0], host=proxy[1], port=proxy[2])
+    return await async_proxy.connect(dest_host=host, dest_port=port, timeout=timeout)
@@ -0,0 +1,173 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from types import TracebackType
+from typing import (
+    Deque,
+    Dict,
+    Optional,
+    Type,
+)
+
+from web3._utils.request import (
+    DEFAULT_TIMEOUT,
+)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(ConnectionError):
+    pass
+
+
+class AdaptiveTimeouts:
+    """
+    Per-method request deadlines derived from observed latencies
+
+    The deadline of a method is its ``percentile`` latency over the last ``window_size`` requests
+    multiplied by ``multiplier``, clamped to ``[min_timeout, max_timeout]``. ``default_timeout`` is used
+    until ``min_samples`` latencies are recorded, ``overrides`` sets fixed deadlines for some methods.
+    """
+    def __init__(
+            self,
+            default_timeout: float = DEFAULT_TIMEOUT,
+            min_timeout: float = 1.0,
+            max_timeout: float = DEFAULT_TIMEOUT,
+            percentile: float = 0.99,
+            multiplier: float = 3.0,
+            window_size: int = 200,
+            min_samples: int = 20,
+            overrides: Optional[Dict[str, float]] = None
+    ) -> None:
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self.overrides = overrides or {}
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._sample_counts: Dict[str, int] = {}
+        self._timeouts: Dict[str, float] = {}
+
+    def get_timeout(self, method: str) -> float:
+        override = self.overrides.get(method)
+        if override is not None:
+            return override
+        return self._timeouts.get(method, self.default_timeout)
+
+    def record_latency(self, method: str, latency: float) -> None:
+        latencies = self._latencies.get(method)
+        if latencies is None:
+            latencies = self._latencies[method] = deque(maxlen=self.window_size)
+        latencies.append(latency)
+        sample_count = self._sample_counts[method] = self._sample_counts.get(method, 0) + 1
+        # sorting the window on every request is wasteful, the deadline is refreshed every few samples
+        if sample_count >= self.min_samples and (sample_count - self.min_samples) % 8 == 0:
+            ordered = sorted(latencies)
+            observed = ordered[min(len(ordered) - 1, int(self.percentile * len(ordered)))]
+            self._timeouts[method] = min(self.max_timeout, max(self.min_timeout, observed * self.multiplier))
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to an endpoint (or through a proxy) after ``failure_threshold`` consecutive failures
+
+    Once open, requests fail fast with ``CircuitOpenError`` for ``recovery_timeout`` seconds, then a single
+    probe request is let through (half-open): its success closes the circuit, its failure opens it again.
+    Share one instance between providers using the same endpoint or proxy to break them together.
+    """
+    logger = logging.getLogger("web3_proxy_providers.utils.CircuitBreaker")
+
+    def __init__(
+            self,
+            failure_threshold: int = 5,
+            recovery_timeout: float = 30.0,
+            name: Optional[str] = None
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.name = name
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def before_request(self) -> None:
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.recovery_timeout:
+                raise CircuitOpenError('Circuit {0} is open'.format(self.name or id(self)))
+            self.logger.debug("Circuit %s is half open, probing", self.name)
+            self.state = HALF_OPEN
+        elif self.state == HALF_OPEN and self._probe_in_flight:
+            raise CircuitOpenError('Circuit {0} is half open, waiting for probe request'.format(self.name or id(self)))
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            self.logger.info("Circuit %s closed", self.name)
+        self.state = CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.logger.warning("Circuit %s opened after %d consecutive failures", self.name, self._failures)
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        # a cancelled probe says nothing about the endpoint, let the next request probe it again
+        self._probe_in_flight = False
+
+
+class RequestGuard:
+    """
+    Context manager applying adaptive timeouts and circuit breaking to a single request,
+    entering it returns the deadline for the request (None if timeouts are not configured)
+    """
+    def __init__(
+            self,
+            method: str,
+            timeouts: Optional[AdaptiveTimeouts],
+            circuit_breaker: Optional[CircuitBreaker]
+    ) -> None:
+        self.method = method
+        self.timeouts = timeouts
+        self.circuit_breaker = circuit_breaker
+        self.timeout: Optional[float] = None
+        self._start = 0.0
+
+    def __enter__(self) -> Optional[float]:
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_request()
+        if self.timeouts is not None:
+            self.timeout = self.timeouts.get_timeout(self.method)
+        self._start = time.monotonic()
+        return self.timeout
+
+    def __exit__(
+            self,
+            exc_type: Optional[Type[BaseException]],
+            exc_val: Optional[BaseException],
+            exc_tb: Optional[TracebackType],
+    ) -> None:
+        if exc_type is None or issubclass(exc_type, asyncio.TimeoutError):
+            if self.timeouts is not None:
+                self.timeouts.record_latency(self.method, time.monotonic() - self._start)
+        if self.circuit_breaker is None:
+            return
+        if exc_type is None:
+            self.circuit_breaker.record_success()
+        elif issubclass(exc_type, Exception):
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.release()
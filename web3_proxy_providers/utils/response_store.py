@@ -0,0 +1,121 @@
+import os
+import json
+import mmap
+import zlib
+import struct
+import hashlib
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from web3._utils.encoding import (
+    Web3JsonEncoder,
+)
+
+# index record: sha256 of (method, params), offset and length of the compressed record in the data file
+_INDEX_RECORD = struct.Struct('<32sQI')
+
+
+class ResponseNotRecorded(KeyError):
+    pass
+
+
+class ResponseStore:
+    """
+    Append-only on-disk store of ``(method, params, response)`` records
+
+    Records are zlib compressed JSON appended to ``<path>.data``, each one is indexed by a fixed size
+    entry in ``<path>.idx``. The data file is memory-mapped for lookups, the index is loaded
+    into memory when the store is opened. Records are written before their index entries and both files are
+    synced to disk on ``sync`` and ``close``, index entries of partially written records (e.g. after a crash)
+    are truncated on the next open.
+    """
+    def __init__(self, path: str) -> None:
+        self.data_path = path + '.data'
+        self.index_path = path + '.idx'
+        self._index: Dict[bytes, List[Tuple[int, int]]] = {}
+        self._data_file = open(self.data_path, 'a+b')
+        self._index_file = open(self.index_path, 'a+b')
+        self._mmap: Optional[mmap.mmap] = None
+        self._load_index()
+
+    @staticmethod
+    def make_key(method: str, params: Any) -> bytes:
+        encoded = json.dumps([method, params], cls=Web3JsonEncoder, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(encoded.encode()).digest()
+
+    def _load_index(self) -> None:
+        data_size = os.fstat(self._data_file.fileno()).st_size
+        self._index_file.seek(0)
+        raw_index = self._index_file.read()
+        valid_size = len(raw_index) - len(raw_index) % _INDEX_RECORD.size
+        for position, (key, offset, length) in enumerate(_INDEX_RECORD.iter_unpack(raw_index[:valid_size])):
+            if offset + length > data_size:
+                # the record was not fully written, drop its entry (and anything after it) from the index,
+                # otherwise it would point into the data appended next
+                valid_size = position * _INDEX_RECORD.size
+                break
+            self._index.setdefault(key, []).append((offset, length))
+        if valid_size != len(raw_index):
+            self._index_file.truncate(valid_size)
+
+    def _read(self, offset: int, length: int) -> Dict[str, Any]:
+        if self._mmap is None or offset + length > len(self._mmap):
+            if self._mmap is not None:
+                self._mmap.close()
+            self._data_file.flush()
+            self._mmap = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return json.loads(zlib.decompress(self._mmap[offset:offset + length]))
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._index.values())
+
+    def count(self, key: bytes) -> int:
+        return len(self._index.get(key, ()))
+
+    def get(self, key: bytes, position: int = -1) -> Dict[str, Any]:
+        """
+        Returns the response recorded at ``position`` (in recording order) for the request key,
+        the last recorded one by default
+        """
+        entries = self._index.get(key)
+        if not entries:
+            raise ResponseNotRecorded(key.hex())
+        offset, length = entries[position]
+        return self._read(offset, length)['response']
+
+    def append(self, method: str, params: Any, response: Any) -> bytes:
+        key = self.make_key(method, params)
+        record = zlib.compress(json.dumps(
+            {'method': method, 'params': params, 'response': response},
+            cls=Web3JsonEncoder,
+            separators=(',', ':')
+        ).encode())
+        self._data_file.seek(0, os.SEEK_END)
+        offset = self._data_file.tell()
+        self._data_file.write(record)
+        self._data_file.flush()
+        self._index_file.write(_INDEX_RECORD.pack(key, offset, len(record)))
+        self._index_file.flush()
+        self._index.setdefault(key, []).append((offset, len(record)))
+        return key
+
+    def sync(self) -> None:
+        # blocks until the files are on disk, appends only flush to the OS to keep recording cheap
+        os.fsync(self._data_file.fileno())
+        os.fsync(self._index_file.fileno())
+
+    def close(self) -> None:
+        self.sync()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._data_file.close()
+        self._index_file.close()
@@ -0,0 +1,131 @@
+import re
+import json
+import codecs
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    List,
+)
+
+_NON_WHITESPACE = re.compile(r'\S')
+_JSON_DECODER = json.JSONDecoder()
+_JSON_DELIMITERS = frozenset(' \t\r\n,]}')
+
+
+class _JsonStreamReader:
+    """
+    Reads JSON tokens and values from an async stream of byte chunks
+
+    Received text is kept in a list until a value needs it, and a value which is not complete yet
+    is only decoded again once the buffered text has doubled, so reading a large value stays linear.
+    """
+    def __init__(self, chunks: AsyncIterable[bytes]) -> None:
+        self._chunks = chunks.__aiter__()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._pending: List[str] = []
+        self._pending_size = 0
+        self._eof = False
+
+    async def _fill(self) -> bool:
+        if self._eof:
+            return False
+        try:
+            chunk = await self._chunks.__anext__()
+            text = self._text_decoder.decode(chunk)
+        except StopAsyncIteration:
+            self._eof = True
+            text = self._text_decoder.decode(b'', final=True)
+        self._pending.append(text)
+        self._pending_size += len(text)
+        return True
+
+    def _merge(self) -> None:
+        if self._pending:
+            self._buffer = self._buffer[self._pos:] + ''.join(self._pending)
+            self._pos = 0
+            self._pending = []
+            self._pending_size = 0
+
+    async def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character without consuming it
+        """
+        while True:
+            match = _NON_WHITESPACE.search(self._buffer, self._pos)
+            if match is not None:
+                self._pos = match.start()
+                return self._buffer[self._pos]
+            self._pos = len(self._buffer)
+            if not self._pending and not await self._fill():
+                raise ValueError('Unexpected end of JSON-RPC response')
+            self._merge()
+
+    async def expect(self, char: str) -> None:
+        next_char = await self.peek()
+        if next_char != char:
+            raise ValueError('Expected {0!r} in JSON-RPC response, found {1!r}'.format(char, next_char))
+        self._pos += 1
+
+    async def read_value(self) -> Any:
+        await self.peek()
+        retry_size = 0
+        while True:
+            while not self._eof and len(self._buffer) - self._pos + self._pending_size < retry_size:
+                await self._fill()
+            self._merge()
+            try:
+                value, end = _JSON_DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            else:
+                # a number is only complete once it is followed by a delimiter, "1." or "1e" at the
+                # end of a chunk decode as 1 but continue in the next one
+                if (
+                        self._eof or
+                        type(value) not in (int, float) or
+                        end < len(self._buffer) and self._buffer[end] in _JSON_DELIMITERS
+                ):
+                    self._pos = end
+                    return value
+            retry_size = 2 * (len(self._buffer) - self._pos) + 1
+
+
+async def iter_rpc_result(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """
+    Incrementally decodes a JSON-RPC response from a stream of byte chunks.
+
+    If the result is an array its elements are yielded one by one as soon as they are received,
+    any other result is yielded as a single value. Raises ``ValueError`` with the error object
+    for error responses.
+    """
+    reader = _JsonStreamReader(chunks)
+    error = None
+    await reader.expect('{')
+    while await reader.peek() != '}':
+        key = await reader.read_value()
+        await reader.expect(':')
+        if key == 'result' and await reader.peek() == '[':
+            await reader.expect('[')
+            if await reader.peek() == ']':
+                await reader.expect(']')
+            else:
+                while True:
+                    yield await reader.read_value()
+                    if await reader.peek() == ']':
+                        await reader.expect(']')
+                        break
+                    await reader.expect(',')
+        else:
+            value = await reader.read_value()
+            if key == 'result':
+                yield value
+            elif key == 'error':
+                error = value
+        if await reader.peek() == ',':
+            await reader.expect(',')
+    if error is not None:
+        raise ValueError(error)